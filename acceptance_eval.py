@@ -1,7 +1,8 @@
 """
 Acceptance thresholds checker.
 
-- Loads the most recent logs/run_*.csv
+- Loads the most recent session: logs/run_*.csv, or logs/store/ once
+  compacted (compact_logs.py --delete)
 - Computes medians for key metrics and checks against targets:
     cold_start_ms      <= 1500
     warm_start_ms      <= 800
@@ -12,7 +13,8 @@ Acceptance thresholds checker.
 Tip: This script looks at the latest session only.
 """
 
-import glob, pandas as pd, json
+import pandas as pd, json
+from services import log_store
 
 TARGETS = {
     "cold_start_ms": 1500,
@@ -21,9 +23,11 @@ TARGETS = {
     "reroute_latency_ms": 1000
 }
 
-files = sorted(glob.glob("logs/*.csv"))
-if not files: raise SystemExit("No logs found.")
-df = pd.read_csv(files[-1])
+session, rows = log_store.latest_session()
+if not rows: raise SystemExit("No logs found.")
+print(f"[info] session: {session}")
+df = pd.DataFrame(rows, columns=["ts", "type", "label", "value_ms"])
+df["value_ms"] = pd.to_numeric(df["value_ms"], errors="coerce")
 
 def med(evt):
     d = df[df.type==evt]
@@ -5,16 +5,24 @@ Outputs:
   - P3_reroute.png    (Reroute latency histogram)
   - P4_battery.png    (optional; session battery start/end)
   - P7_prewarm.png    (optional; TTS prewarm histogram)
+  - P8_memory.png     (optional; mem_* snapshots over the session, INDOORNAV_MEMPROF=1)
   - Prints per-session medians
   - Prints latest-session robust stats (median, IQR, 95% CI)
   - Prints A/B analysis for TTS prewarm (ON vs OFF)
   - Saves CSV summaries in charts/
+Inputs
+  - logs/store/ (see compact_logs.py) plus any logs/run_*.csv not compacted yet
+  - Filters: --since/--until YYYY-MM-DD, --device, --persona, --prewarm on|off
+    Store partitions are pruned via logs/store/index.csv before any
+    event rows are read.
+  - Charts are only re-rendered when their input changed (--force to redo
+    all); see services/charts.py.
 """
 
-import os, glob
+import os, argparse
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from services import log_store, charts
 
 os.makedirs("charts", exist_ok=True)
 
@@ -24,51 +32,50 @@ N_BOOT = 2000             # bootstrap iterations for 95% CI
 RNG = np.random.default_rng(42)
 # ----------------------------
 
-# Load logs
-files = sorted(glob.glob("logs/run_*.csv"))
-if not files:
-    raise SystemExit("No logs found. Run main.py first.")
+def parse_args():
+    ap = argparse.ArgumentParser(description="Analyze IndoorNav session logs.")
+    ap.add_argument("--store", default=log_store.STORE_DIR)
+    ap.add_argument("--since", help="first partition date, YYYY-MM-DD")
+    ap.add_argument("--until", help="last partition date, YYYY-MM-DD")
+    ap.add_argument("--device")
+    ap.add_argument("--persona", choices=["blind", "low-vision"])
+    ap.add_argument("--prewarm", choices=["on", "off"])
+    ap.add_argument("--force", action="store_true", help="re-render charts even if unchanged")
+    return ap.parse_args()
 
-def load_sessions(files_list):
+# Load logs
+def load_sessions(args):
+    where = {"device": args.device, "persona": args.persona,
+             "prewarm": None if args.prewarm is None else int(args.prewarm == "on")}
     dfs = []
-    for f in files_list:
+    loose = log_store.loose_sessions("logs", args.store)
+    # compacted sessions: prune on the index, then read only matching partitions
+    # (sessions whose CSV changed since are read from the CSV below instead)
+    names = {os.path.basename(f) for f in loose}
+    rows = [r for r in log_store.select(log_store.read_index(args.store), args.since, args.until, **where)
+            if r["session"] not in names]
+    if rows:
+        cols = log_store.load_events(rows, args.store)
+        dfs.append(pd.DataFrame({"ts": cols["ts"], "type": cols["type"], "label": cols["label"],
+                                 "value_ms": cols["value_ms"], "session": cols["session"]}))
+    # loose CSVs not compacted yet: same filters, computed on the fly
+    for f in loose:
         try:
-            d = pd.read_csv(f)
-            d["session"] = os.path.basename(f)
-            dfs.append(d)
+            recs = log_store.read_loose(f, args.store)
         except Exception as e:
             print(f"[warn] skip {f}: {e}")
+            continue
+        meta = log_store.session_meta(os.path.basename(f), recs)
+        if not log_store.select([meta], args.since, args.until, **where):
+            continue
+        d = pd.DataFrame(recs, columns=["ts", "type", "label", "value_ms"])
+        d["value_ms"] = pd.to_numeric(d["value_ms"], errors="coerce")
+        d["session"] = meta["session"]
+        dfs.append(d)
     if not dfs:
-        raise SystemExit("No readable logs.")
+        raise SystemExit("No logs found. Run main.py first.")
     return pd.concat(dfs, ignore_index=True)
 
-df_all = load_sessions(files)
-
-# Per-session medians (for quick sanity check)
-def per_session_median(evt):
-    d = df_all[df_all["type"] == evt]
-    if d.empty: 
-        return pd.Series(dtype=float)
-    return d.groupby("session")["value_ms"].median()
-
-table = pd.concat([
-    per_session_median("cold_start_ms").rename("cold_start_ms"),
-    per_session_median("warm_start_ms").rename("warm_start_ms"),
-    per_session_median("tts_start_latency_ms").rename("tts_start_latency_ms"),
-    per_session_median("reroute_latency_ms").rename("reroute_latency_ms"),
-], axis=1)
-
-print("=== Per-session medians (ms) ===")
-print(table.fillna("—"))
-
-# Choose dataset for charts & robust stats
-if USE_LATEST_ONLY:
-    latest = files[-1]
-    print(f"\n[info] Using latest session for charts & robust stats: {os.path.basename(latest)}")
-    df = pd.read_csv(latest)
-else:
-    df = df_all.copy()
-
 # ---------- Helper stats ----------
 def robust_stats(series: pd.Series, n_boot=N_BOOT):
     s = pd.to_numeric(series, errors="coerce").dropna()
@@ -91,126 +98,140 @@ def save_summary_row(rows, name, series):
         "n": n
     })
 
-# ---------- Charts P1–P4, P7 ----------
-# P1: cold vs warm
-cold = df[df["type"]=="cold_start_ms"]["value_ms"]
-warm = df[df["type"]=="warm_start_ms"]["value_ms"]
-cold_med = np.median(cold) if not cold.empty else np.nan
-warm_med = np.median(warm) if not warm.empty else np.nan
-
-plt.figure()
-plt.bar(["cold","warm"], [cold_med, warm_med])
-plt.title("P1 Cold vs Warm (median ms)")
-plt.ylabel("ms")
-plt.savefig("charts/P1_startup.png", bbox_inches="tight")
-plt.close()
-
-# P2: TTS start by step (median)
-tts = df[df["type"]=="tts_start_latency_ms"]
-if not tts.empty:
-    g = tts.groupby("label")["value_ms"].median().sort_values()
-    plt.figure()
-    g.plot(kind="bar")
-    plt.title("P2 TTS Start Latency by Step (median ms)")
-    plt.ylabel("ms")
-    plt.savefig("charts/P2_tts.png", bbox_inches="tight")
-    plt.close()
-
-# P3: reroute histogram
-rr = df[df["type"]=="reroute_latency_ms"]
-if not rr.empty:
-    plt.figure()
-    rr["value_ms"].plot(kind="hist", bins=10)
-    plt.title("P3 Reroute Latency Distribution")
-    plt.xlabel("ms")
-    plt.savefig("charts/P3_reroute.png", bbox_inches="tight")
-    plt.close()
-
-# P4: battery (optional)
-bs = df[df["type"]=="battery_start_pct"]["value_ms"]
-be = df[df["type"]=="battery_end_pct"]["value_ms"]
-if not bs.empty and not be.empty:
-    s = pd.Series({"start(%)": bs.iloc[-1], "end(%)": be.iloc[-1]})
-    plt.figure()
-    s.plot(kind="bar")
-    plt.ylim(0, 100)
-    plt.title("P4 Battery % (session)")
-    plt.savefig("charts/P4_battery.png", bbox_inches="tight")
-    plt.close()
-
-# P7: prewarm histogram (optional)
-pre = df[df["type"]=="tts_prewarm_ms"]["value_ms"]
-if not pre.empty:
-    plt.figure()
-    pre.plot(kind="hist", bins=10)
-    plt.title("P7 TTS Prewarm (ms)")
-    plt.savefig("charts/P7_prewarm.png", bbox_inches="tight")
-    plt.close()
-
-# ---------- Robust stats (latest or all, depending on USE_LATEST_ONLY) ----------
-rows = []
-save_summary_row(rows, "cold_start_ms", cold)
-save_summary_row(rows, "warm_start_ms", warm)
-save_summary_row(rows, "tts_start_latency_ms", tts["value_ms"])
-save_summary_row(rows, "reroute_latency_ms", rr["value_ms"])
-summary_df = pd.DataFrame(rows)
-summary_df.to_csv("charts/summary_metrics.csv", index=False)
-
-print("\n=== Enhanced stats (median / IQR / 95% CI) ===")
-print(summary_df.fillna("—"))
-
-# ---------- A/B: Prewarm ON vs OFF over sessions ----------
-def session_has_prewarm(path):
-    try:
-        d = pd.read_csv(path)
-        return (d["type"]=="tts_prewarm_ms").any()
-    except Exception:
-        return False
-
-ab_rows = []
-for f in files:
-    d = pd.read_csv(f)
-    cond = "ON" if session_has_prewarm(f) else "OFF"
-    s = d[d["type"]=="tts_start_latency_ms"]["value_ms"]
-    if not s.empty:
-        ab_rows.append({
-            "session": os.path.basename(f),
-            "cond": cond,
-            "tts_start_median": float(np.median(s))
+def main():
+    args = parse_args()
+    df_all = load_sessions(args)
+    sessions = sorted(df_all["session"].unique())  # run_YYYYmmdd_HHMMSS sorts by time
+
+    # Per-session medians (for quick sanity check)
+    def per_session_median(evt):
+        d = df_all[df_all["type"] == evt]
+        if d.empty: 
+            return pd.Series(dtype=float)
+        return d.groupby("session")["value_ms"].median()
+
+    table = pd.concat([
+        per_session_median("cold_start_ms").rename("cold_start_ms"),
+        per_session_median("warm_start_ms").rename("warm_start_ms"),
+        per_session_median("tts_start_latency_ms").rename("tts_start_latency_ms"),
+        per_session_median("reroute_latency_ms").rename("reroute_latency_ms"),
+    ], axis=1)
+
+    print("=== Per-session medians (ms) ===")
+    print(table.fillna("—"))
+
+    # Choose dataset for charts & robust stats
+    if USE_LATEST_ONLY:
+        latest = sessions[-1]
+        print(f"\n[info] Using latest session for charts & robust stats: {latest}")
+        df = df_all[df_all["session"] == latest]
+    else:
+        df = df_all.copy()
+
+    # ---------- Charts P1–P4, P7, P8 ----------
+    jobs = []
+    # P1: cold vs warm
+    cold = df[df["type"]=="cold_start_ms"]["value_ms"]
+    warm = df[df["type"]=="warm_start_ms"]["value_ms"]
+    cold_med = np.median(cold) if not cold.empty else np.nan
+    warm_med = np.median(warm) if not warm.empty else np.nan
+    jobs.append(("P1_startup.png", charts.p1_startup, {"cold": float(cold_med), "warm": float(warm_med)}))
+
+    # P2: TTS start by step (median)
+    tts = df[df["type"]=="tts_start_latency_ms"]
+    if not tts.empty:
+        g = tts.groupby("label")["value_ms"].median().sort_values()
+        jobs.append(("P2_tts.png", charts.p2_tts,
+                     {"labels": [str(x) for x in g.index], "values": [float(x) for x in g]}))
+
+    # P3: reroute histogram
+    rr = df[df["type"]=="reroute_latency_ms"]
+    if not rr.empty:
+        jobs.append(("P3_reroute.png", charts.p3_reroute, [float(x) for x in rr["value_ms"]]))
+
+    # P4: battery (optional)
+    bs = df[df["type"]=="battery_start_pct"]["value_ms"]
+    be = df[df["type"]=="battery_end_pct"]["value_ms"]
+    if not bs.empty and not be.empty:
+        jobs.append(("P4_battery.png", charts.p4_battery, {"start": float(bs.iloc[-1]), "end": float(be.iloc[-1])}))
+
+    # P7: prewarm histogram (optional)
+    pre = df[df["type"]=="tts_prewarm_ms"]["value_ms"]
+    if not pre.empty:
+        jobs.append(("P7_prewarm.png", charts.p7_prewarm, [float(x) for x in pre]))
+
+    # P8: memory over session (optional)
+    mem = df[df["type"].isin(["mem_current_kb", "mem_rss_kb"])]
+    if not mem.empty:
+        t = (pd.to_datetime(mem["ts"]) - pd.to_datetime(df["ts"]).min()).dt.total_seconds()
+        series = {}
+        for typ, key in (("mem_current_kb", "current"), ("mem_rss_kb", "rss")):
+            m = mem["type"] == typ
+            series[key] = {"t": [round(float(x), 3) for x in t[m]], "kb": [float(x) for x in mem["value_ms"][m]],
+                           "point": [str(x) for x in mem["label"][m]]}
+        jobs.append(("P8_memory.png", charts.p8_memory, series))
+
+    charts.render(jobs, "charts", force=args.force)
+
+    # ---------- Robust stats (latest or all, depending on USE_LATEST_ONLY) ----------
+    rows = []
+    save_summary_row(rows, "cold_start_ms", cold)
+    save_summary_row(rows, "warm_start_ms", warm)
+    save_summary_row(rows, "tts_start_latency_ms", tts["value_ms"])
+    save_summary_row(rows, "reroute_latency_ms", rr["value_ms"])
+    summary_df = pd.DataFrame(rows)
+    summary_df.to_csv("charts/summary_metrics.csv", index=False)
+
+    print("\n=== Enhanced stats (median / IQR / 95% CI) ===")
+    print(summary_df.fillna("—"))
+
+    # ---------- A/B: Prewarm ON vs OFF over sessions ----------
+    ab_rows = []
+    for name, d in df_all.groupby("session", sort=True):
+        cond = "ON" if (d["type"]=="tts_prewarm_ms").any() else "OFF"
+        s = d[d["type"]=="tts_start_latency_ms"]["value_ms"].dropna()
+        if not s.empty:
+            ab_rows.append({
+                "session": name,
+                "cond": cond,
+                "tts_start_median": float(np.median(s))
+            })
+
+    ab = pd.DataFrame(ab_rows)
+    if ab.empty or ab["cond"].nunique() < 2:
+        print("\n[info] A/B prewarm: need sessions with both ON and OFF to compare.")
+    else:
+        print("\n=== A/B Prewarm (per-session median of TTS start latency) ===")
+        print(ab.pivot_table(index="cond", values="tts_start_median", aggfunc="median"))
+
+        on  = ab[ab["cond"]=="ON"]["tts_start_median"].to_numpy()
+        off = ab[ab["cond"]=="OFF"]["tts_start_median"].to_numpy()
+
+        # Group-median difference (ON - OFF) with bootstrap CI over sessions
+        def boot_ab(n_boot=N_BOOT):
+            diffs = []
+            for _ in range(n_boot):
+                bo = RNG.choice(on,  size=len(on),  replace=True)
+                bf = RNG.choice(off, size=len(off), replace=True)
+                diffs.append(np.median(bo) - np.median(bf))
+            return np.array(diffs)
+
+        diffs = boot_ab()
+        diff_med = float(np.median(diffs))
+        ci_low, ci_high = float(np.percentile(diffs, 2.5)), float(np.percentile(diffs, 97.5))
+        rel_change = (np.median(on)/np.median(off) - 1.0) * 100.0
+
+        ab_out = pd.DataFrame({
+            "cond": ["ON_median", "OFF_median", "ON-OFF_median", "ON_vs_OFF_%change", "CI95_low", "CI95_high"],
+            "value": [np.median(on), np.median(off), diff_med, rel_change, ci_low, ci_high]
         })
+        ab_out.to_csv("charts/ab_prewarm_summary.csv", index=False)
 
-ab = pd.DataFrame(ab_rows)
-if ab.empty or ab["cond"].nunique() < 2:
-    print("\n[info] A/B prewarm: need sessions with both ON and OFF to compare.")
-else:
-    print("\n=== A/B Prewarm (per-session median of TTS start latency) ===")
-    print(ab.pivot_table(index="cond", values="tts_start_median", aggfunc="median"))
-
-    on  = ab[ab["cond"]=="ON"]["tts_start_median"].to_numpy()
-    off = ab[ab["cond"]=="OFF"]["tts_start_median"].to_numpy()
-
-    # Group-median difference (ON - OFF) with bootstrap CI over sessions
-    def boot_ab(n_boot=N_BOOT):
-        diffs = []
-        for _ in range(n_boot):
-            bo = RNG.choice(on,  size=len(on),  replace=True)
-            bf = RNG.choice(off, size=len(off), replace=True)
-            diffs.append(np.median(bo) - np.median(bf))
-        return np.array(diffs)
-
-    diffs = boot_ab()
-    diff_med = float(np.median(diffs))
-    ci_low, ci_high = float(np.percentile(diffs, 2.5)), float(np.percentile(diffs, 97.5))
-    rel_change = (np.median(on)/np.median(off) - 1.0) * 100.0
-
-    ab_out = pd.DataFrame({
-        "cond": ["ON_median", "OFF_median", "ON-OFF_median", "ON_vs_OFF_%change", "CI95_low", "CI95_high"],
-        "value": [np.median(on), np.median(off), diff_med, rel_change, ci_low, ci_high]
-    })
-    ab_out.to_csv("charts/ab_prewarm_summary.csv", index=False)
+        print(f"Median difference (ON - OFF): {diff_med:.1f} ms  [95% CI {ci_low:.1f}, {ci_high:.1f}]")
+        print(f"Relative change: {rel_change:+.1f}%  (negative is better)")
+        print("Saved A/B summary -> charts/ab_prewarm_summary.csv")
 
-    print(f"Median difference (ON - OFF): {diff_med:.1f} ms  [95% CI {ci_low:.1f}, {ci_high:.1f}]")
-    print(f"Relative change: {rel_change:+.1f}%  (negative is better)")
-    print("Saved A/B summary -> charts/ab_prewarm_summary.csv")
+    print("\nCharts saved -> ./charts")
 
-print("\nCharts saved -> ./charts")
+if __name__ == "__main__":
+    main()
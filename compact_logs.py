@@ -0,0 +1,49 @@
+"""
+compact_logs.py — merge logs/run_*.csv sessions into the partitioned store
+Usage
+  python compact_logs.py                # compact, keep the CSVs
+  python compact_logs.py --delete       # remove CSVs once they are stored
+Outputs
+  logs/store/date=YYYY-MM-DD/events.npz  # columnar events per start date
+  logs/store/index.csv                   # per-session metadata
+Notes
+  Sessions already in the index are skipped, so the script can be re-run;
+  a CSV that kept growing after it was compacted is compacted again.
+  Files modified in the last --min-age seconds are left alone (the app
+  may still be writing them). --delete only removes a CSV whose rows all
+  made it into the store.
+"""
+
+import os, glob, time, argparse
+from services import log_store
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--logs", default="logs")
+    ap.add_argument("--store", default=log_store.STORE_DIR)
+    ap.add_argument("--min-age", type=float, default=60.0, help="seconds since last write")
+    ap.add_argument("--delete", action="store_true", help="delete CSVs after compaction")
+    args = ap.parse_args()
+
+    now = time.time()
+    files = [f for f in sorted(glob.glob(os.path.join(args.logs, "run_*.csv")))
+             if now - os.path.getmtime(f) >= args.min_age]
+    loose = set(log_store.loose_sessions(args.logs, args.store))
+
+    added = log_store.compact([f for f in files if f in loose], args.store)
+    parts = sorted({m["partition"] for m in added})
+    print(f"Compacted {len(added)} session(s) into {len(parts)} partition(s): {', '.join(parts) or '-'}")
+
+    if args.delete:
+        # also covers CSVs compacted by an earlier run without --delete; a CSV
+        # with rows the store does not have yet (still being written) is kept
+        stored = {m["session"]: m for m in log_store.read_index(args.store)}
+        n = 0
+        for f in files:
+            meta = stored.get(os.path.basename(f))
+            if meta and log_store.is_compacted(log_store.read_session_csv(f), meta):
+                os.remove(f); n += 1
+        print(f"Deleted {n} CSV file(s).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+loadgen.py — local load generator for route_server.py
+Usage
+  python loadgen.py --spawn                       # start a local server too
+  python loadgen.py --url http://127.0.0.1:8765 --levels 1,4,16,64 --duration 5
+Behaviour
+  For each concurrency level, runs that many clients, each on its own
+  keep-alive connection, sending POST /route back-to-back for --duration
+  seconds. Requests cycle through --distinct (origin, destination) pairs,
+  so identical requests overlap and exercise server-side batching.
+Console
+  level | ok | 503 | err | req/s | p50 ms | p99 ms
+"""
+
+import sys, json, time, asyncio, argparse, subprocess
+from urllib.parse import urlsplit
+
+async def _request(reader, writer, host, body):
+    writer.write((f"POST /route HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        k, _, v = h.decode("latin-1").partition(":")
+        if k.strip().lower() == "content-length":
+            length = int(v)
+    await reader.readexactly(length)
+    return status
+
+async def _client(host, port, bodies, offset, deadline, lat, counts):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                status = await _request(reader, writer, host, bodies[i % len(bodies)])
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+                counts["err"] += 1
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            if status == 200:
+                lat.append((time.perf_counter() - t0) * 1000)
+                counts["ok"] += 1
+            elif status == 503:
+                counts["503"] += 1
+                await asyncio.sleep(0.05)
+            else:
+                counts["err"] += 1
+            i += 1
+    finally:
+        writer.close()
+
+def pct(xs, p):
+    if not xs:
+        return float("nan")
+    xs = sorted(xs)
+    return xs[min(len(xs)-1, int(round(p/100.0 * (len(xs)-1))))]
+
+async def run_level(host, port, conc, duration, bodies):
+    lat, counts = [], {"ok": 0, "503": 0, "err": 0}
+    t0 = time.perf_counter()
+    await asyncio.gather(*[_client(host, port, bodies, k, t0 + duration, lat, counts) for k in range(conc)])
+    elapsed = time.perf_counter() - t0
+    return counts, counts["ok"] / elapsed, pct(lat, 50), pct(lat, 99)
+
+async def main_async(a):
+    u = urlsplit(a.url)
+    host, port = u.hostname or "127.0.0.1", u.port or 80
+    steps = [1, 2, 3, 4, 5][:max(1, a.distinct)]
+    bodies = [json.dumps({"venue": a.venue, "origin": o, "destination": None, "persona": "blind"}).encode()
+              for o in steps]
+    print(f"{'level':>5} | {'ok':>6} | {'503':>5} | {'err':>4} | {'req/s':>8} | {'p50 ms':>7} | {'p99 ms':>7}")
+    for conc in a.levels:
+        counts, rps, p50, p99 = await run_level(host, port, conc, a.duration, bodies)
+        print(f"{conc:>5} | {counts['ok']:>6} | {counts['503']:>5} | {counts['err']:>4} | "
+              f"{rps:>8.1f} | {p50:>7.1f} | {p99:>7.1f}")
+
+def _wait_ready(url, timeout=10.0):
+    import urllib.request
+    t_end = time.time() + timeout
+    while time.time() < t_end:
+        try:
+            urllib.request.urlopen(url + "/health", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit(f"Route service at {url} did not come up.")
+
+def main():
+    ap = argparse.ArgumentParser(description="Load generator for route_server.py.")
+    ap.add_argument("--url", default="http://127.0.0.1:8765")
+    ap.add_argument("--venue", default="route")
+    ap.add_argument("--levels", default="1,2,4,8,16,32,64",
+                    type=lambda s: [int(x) for x in s.split(",") if x])
+    ap.add_argument("--duration", type=float, default=3.0, help="seconds per level")
+    ap.add_argument("--distinct", type=int, default=3, help="distinct routes requested (1-5)")
+    ap.add_argument("--spawn", action="store_true", help="start route_server.py for the run")
+    ap.add_argument("--compute-ms", default="300", help="passed to the spawned server")
+    a = ap.parse_args()
+
+    proc = None
+    if a.spawn:
+        port = str(urlsplit(a.url).port or 8765)
+        proc = subprocess.Popen([sys.executable, "route_server.py", "--port", port, "--compute-ms", a.compute_ms])
+    try:
+        _wait_ready(a.url.rstrip("/"))
+        asyncio.run(main_async(a))
+    finally:
+        if proc is not None:
+            proc.terminate(); proc.wait()
+
+if __name__ == "__main__":
+    main()
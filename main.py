@@ -23,6 +23,28 @@ Key logging events
 - settings_*: when an accessibility setting changes.
 - tts_prewarm_ms: duration of prewarm call.
 
+Route service (optional)
+------------------------
+Set INDOORNAV_ROUTE_SERVER=http://host:port to fetch steps and reroutes
+from route_server.py; the bundled data/route.json is used if it fails.
+Calls run on the UI thread with a 1 s timeout and no retry after a timeout.
+
+Memory profiling (optional)
+---------------------------
+Set INDOORNAV_MEMPROF=1 to log tracemalloc snapshots (mem_* events) at
+app build, every screen enter, every N steps (INDOORNAV_MEMPROF_STEPS,
+default 5) and after a reroute. Except at build, snapshots are deferred
+with Clock.schedule_once so they stay out of warm_start_ms and the tap
+latencies;
+INDOORNAV_COMPACT_STEPS=1 loads the route as compact __slots__/array
+records so the saving shows up in mem_alloc_kb (route_steps).
+
+Tracing
+-------
+Set INDOORNAV_TRACE=1 to record spans (services/tracing.py); on exit the
+trace is written next to the CSV log as logs/run_*.trace.json
+(open in chrome://tracing or ui.perfetto.dev).
+
 Notes
 -----
 Window is set to phone size so screenshots look like a mobile app.
@@ -32,13 +54,14 @@ on PCs and are treated as limitations in the report.
 # Phone-sized window for "mobile-like" screenshots
 # Window.size = (390, 844)
 
-# Inside Home.start_nav(): log click and capture NAV start timestamp
-# Inside Navigate.on_enter(): compute/Log warm_start_ms
+# Inside Home.start_nav(): log click and open the warm_start span
+# Inside Navigate.on_enter(): end the span and log warm_start_ms
 
 # In Settings.run_prewarm(): calling prewarm() writes tts_prewarm_ms
 
-import time
+import os
 from kivy.app import App
+from kivy.clock import Clock
 from kivy.core.window import Window
 from kivy.uix.screenmanager import ScreenManager, Screen, NoTransition
 from kivy.uix.boxlayout import BoxLayout
@@ -47,12 +70,18 @@ from kivy.uix.button import Button
 from kivy.uix.togglebutton import ToggleButton
 from kivy.uix.spinner import Spinner
 
-from services.logger import log, APP_T0
+from services.logger import log, APP_T0, LOG_PATH
+from services import tracing, memprof
 from models.route_model import RouteModel
 from viewmodels.nav_vm import NavViewModel
+from services.route_client import RouteClient, RouteServiceError
 from services.tts_adapter import prewarm
 
-NAV_T0 = None
+# cold start is measured from process start (logger import), not from here
+APP_SPAN = tracing.start("cold_start", t0=APP_T0)
+memprof.start()
+memprof.defer = lambda fn: Clock.schedule_once(lambda dt: fn())
+COMPACT_STEPS = os.environ.get("INDOORNAV_COMPACT_STEPS", "") not in ("", "0")
 
 # 手机比例窗口（截图更像移动端）
 Window.size = (390, 844)
@@ -87,7 +116,7 @@ class Home(Screen):
     def start_nav(self):
         from kivy.app import App
         app = App.get_running_app()
-        app.nav_t0 = time.perf_counter()  # 记录点击时刻
+        app.nav_span = tracing.start("warm_start")  # 记录点击时刻
         log("click_start_nav")
         self.manager.current = "nav"
 
@@ -128,7 +157,7 @@ class Settings(Screen):
 class Navigate(Screen):
     def __init__(self, app, route_steps, **kw):
         super().__init__(**kw); self.app = app
-        self.vm = NavViewModel(route_steps, app.settings)
+        self.vm = NavViewModel(route_steps, app.settings, client=app.route_client)
 
         scale = 1.3 if app.settings["textscale"]=="large" else 1.0
         self.box = BoxLayout(orientation='vertical', padding=16, spacing=12)
@@ -142,8 +171,6 @@ class Navigate(Screen):
         self.box.add_widget(self.title); self.box.add_widget(self.info); self.box.add_widget(self.step); self.box.add_widget(row)
         self.add_widget(self.box)
 
-        log("warm_start_ms","",int((time.perf_counter()-APP_T0)*1000))
-
     def show_text(self,t): self.step.text=t
     def show_prog(self,i,n): self.info.text=f"Step {i}/{n}"
 
@@ -157,10 +184,9 @@ class Navigate(Screen):
     def on_enter(self):
         from kivy.app import App
         app = App.get_running_app()
-        if app.nav_t0 is not None:
-            dt = int((time.perf_counter() - app.nav_t0) * 1000)
-            log("warm_start_ms", "", dt)
-            app.nav_t0 = None  # 重置，避免重复记
+        if app.nav_span is not None:
+            log("warm_start_ms", "", app.nav_span.end())
+            app.nav_span = None  # 重置，避免重复记
 
 class Arrived(Screen):
     def __init__(self, **kw):
@@ -177,17 +203,37 @@ class Arrived(Screen):
 class NavApp(App):
     def __init__(self, **kw):
         super().__init__(**kw); self.settings = DEFAULT_SETTINGS.copy()
-        self.nav_t0 = None
+        self.nav_span = None
+        url = os.environ.get("INDOORNAV_ROUTE_SERVER")
+        self.route_client = RouteClient(url) if url else None
+
+    def load_steps(self):
+        if self.route_client is not None:
+            try:
+                return self.route_client.route(persona=self.settings["persona"])
+            except RouteServiceError as e:
+                log("route_server_error", "route", str(e))
+        with memprof.track("route_steps"):
+            return RouteModel(compact=COMPACT_STEPS).steps
 
     def build(self):
-        log("cold_start_ms","",int((time.perf_counter()-APP_T0)*1000))
+        log("cold_start_ms","",APP_SPAN.end())
         sm=ScreenManager(transition=NoTransition())
-        steps = RouteModel().steps
+        steps = self.load_steps()
         sm.add_widget(Home(name="home"))
         sm.add_widget(Settings(self, name="settings"))
         sm.add_widget(Navigate(self, steps, name="nav"))
         sm.add_widget(Arrived(name="arrived"))
+        memprof.snapshot("app_build")
+        for s in sm.screens:  # deferred: runs after Navigate.on_enter logs warm_start_ms
+            s.bind(on_enter=lambda s: memprof.snapshot_later(f"enter_{s.name}"))
         return sm
 
+    def on_stop(self):
+        if self.route_client is not None:
+            self.route_client.close()
+        if tracing.ENABLED:
+            tracing.export_chrome(os.path.splitext(LOG_PATH)[0] + ".trace.json")
+
 if __name__ == "__main__":
     NavApp().run()
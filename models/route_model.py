@@ -3,12 +3,84 @@ RouteModel
 
 - Loads turn-by-turn steps from data/route.json
 - Exposes .steps: List[Dict] with fields {id, type, text}
+- RouteModel.for_venue(venue): loads data/<venue>.json ("route" is the demo venue)
+- plan(origin, destination): steps from step id `origin` to `destination`
+  (inclusive; None = first/last step). Raises KeyError for unknown ids and
+  RouteOrderError (a ValueError) when origin comes after destination.
+- RouteModel(compact=True): .steps is a CompactSteps instead of a list of
+  dicts (ids/type codes in arrays, one shared text table; records are
+  __slots__ objects with the same step["text"] / step.get("type") access).
 """
 
-import json
-from typing import List, Dict, Any
+import os, re, sys, json
+from array import array
+from typing import List, Dict, Any, Optional
+
+VENUE_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+STEP_TYPES = ("forward", "left", "right", "arrive")
+
+class RouteOrderError(ValueError):
+    pass
+
+class StepRecord:
+    __slots__ = ("id", "type", "text")
+
+    def __init__(self, id, type, text):
+        self.id, self.type, self.text = id, type, text
+
+    def __getitem__(self, k):
+        try:
+            return getattr(self, k)
+        except (AttributeError, TypeError):
+            raise KeyError(k)
+
+    def get(self, k, default=None):
+        return getattr(self, k, default)
+
+class CompactSteps:
+    """Array-backed step list; indexing yields StepRecord views."""
+    __slots__ = ("ids", "types", "texts")
+
+    def __init__(self, steps=()):
+        self.ids = array("i", (s["id"] for s in steps))
+        self.types = array("B", (self._code(s.get("type", "forward")) for s in steps))
+        self.texts = tuple(sys.intern(s["text"]) for s in steps)
+
+    @staticmethod
+    def _code(t):
+        return STEP_TYPES.index(t) if t in STEP_TYPES else 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            out = CompactSteps()
+            out.ids, out.types, out.texts = self.ids[i], self.types[i], self.texts[i]
+            return out
+        return StepRecord(self.ids[i], STEP_TYPES[self.types[i]], self.texts[i])
 
 class RouteModel:
-    def __init__(self, path="data/route.json"):
+    def __init__(self, path="data/route.json", compact=False):
         data: Dict[str, Any] = json.load(open(path, "r", encoding="utf-8"))
-        self.steps: List[Dict[str, Any]] = data["steps"]
+        self.steps: List[Dict[str, Any]] = CompactSteps(data["steps"]) if compact else data["steps"]
+
+    @classmethod
+    def for_venue(cls, venue: str, data_dir="data") -> "RouteModel":
+        if not VENUE_RE.match(venue or ""):
+            raise KeyError(venue)
+        path = os.path.join(data_dir, f"{venue}.json")
+        if not os.path.exists(path):
+            raise KeyError(venue)
+        return cls(path)
+
+    def plan(self, origin: Optional[int] = None, destination: Optional[int] = None) -> List[Dict[str, Any]]:
+        ids = [s["id"] for s in self.steps]
+        for sid in (origin, destination):
+            if sid is not None and sid not in ids:
+                raise KeyError(sid)
+        i = 0 if origin is None else ids.index(origin)
+        j = len(ids) - 1 if destination is None else ids.index(destination)
+        if i > j:
+            raise RouteOrderError(f"origin {origin} comes after destination {destination}")
+        return self.steps[i:j+1]
@@ -0,0 +1,198 @@
+"""
+replay_sessions.py — re-execute recorded sessions against the current code
+Usage
+  python replay_sessions.py                          # every logs/run_*.csv, real time
+  python replay_sessions.py logs/run_2025*.csv --speed 20 --jobs 8
+  python replay_sessions.py --store --since 2025-10-01 --speed 0
+Behaviour
+  - Rebuilds the input timeline of each session (click_start_nav,
+    click_next, click_reroute, settings_*, tts_prewarm_ms) and drives
+    NavViewModel headlessly with the original gaps divided by --speed
+    (0 = no waiting).
+  - TTS and haptics are simulated. A simulated utterance lasts as long as
+    the session's recorded tts_done_ms for that label (400 ms otherwise),
+    also divided by --speed (so tts_done_ms is only diffed at --speed 1).
+    The reroute computation itself is real code
+    and is not scaled.
+  - Each replay writes logs/replay/<session>; sessions run in parallel
+    across --jobs processes. Sessions with no replayable input (e.g. only
+    cold/warm start rows) are skipped and counted separately.
+Outputs
+  logs/replay/replay_diff.csv   # per session & metric: original vs replay n/median/p90
+  Console: pooled comparison per metric
+Notes
+  cold/warm start come from Kivy screens and are not replayed.
+"""
+
+import os, glob, time, argparse, threading, statistics
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from services import log_store
+
+OUT_DIR = os.path.join("logs", "replay")
+METRICS = ["tts_start_latency_ms", "tts_done_ms", "reroute_latency_ms", "tts_prewarm_ms"]
+INPUTS = ("click_start_nav", "click_next", "click_reroute", "tts_prewarm_ms")
+DEFAULT_TTS_MS = 400  # tts_adapter's fallback utterance length
+
+class SimTTS:
+    """speak_async() stand-in: same callbacks, simulated duration."""
+    def __init__(self, durations, speed):
+        self.durations, self.speed = durations, speed
+        self.threads = []
+
+    def __call__(self, text, on_start=None, on_done=None, label="tts", parent=None):
+        dur = self.durations.get(label, DEFAULT_TTS_MS) / 1000.0
+        def _run():
+            t0 = time.perf_counter()
+            if on_start: on_start(label, t0)
+            if self.speed: time.sleep(dur / self.speed)
+            if on_done: on_done(label, t0, time.perf_counter())
+        th = threading.Thread(target=_run, daemon=True); th.start()
+        self.threads.append(th)
+
+    def join(self):
+        for th in self.threads: th.join()
+
+class SimHaptics:
+    """vibrate_pattern() stand-in: records patterns, no thread."""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, kind="forward", strength="normal", parent=None):
+        self.calls.append((kind, strength))
+
+def _ts(s):
+    try:
+        return datetime.fromisoformat(s).timestamp()
+    except ValueError:
+        return None
+
+def timeline(rows):
+    """Input events as (offset_s, type, label, value), offsets from the first event."""
+    out, t_first = [], None
+    for ts, typ, label, value in rows:
+        if typ not in INPUTS and not typ.startswith("settings_"):
+            continue
+        t = _ts(ts)
+        if t is None: continue
+        t_first = t if t_first is None else t_first
+        out.append((t - t_first, typ, label, value))
+    return out
+
+def metrics(rows):
+    m = {k: [] for k in METRICS}
+    for _, typ, _, value in rows:
+        if typ in m:
+            try: m[typ].append(float(value))
+            except ValueError: pass
+    return m
+
+def replay_one(session, rows, speed, out_dir=OUT_DIR):
+    """Runs in a worker process; returns (session, original metrics, replay metrics)."""
+    from services import logger
+    from services.tts_adapter import prewarm
+    from viewmodels.nav_vm import NavViewModel
+    from models.route_model import RouteModel
+
+    out_path = os.path.join(out_dir, session)
+    logger.set_log_path(out_path)
+    durations = {label: float(v) for _, typ, label, v in rows if typ == "tts_done_ms" and v}
+    tts, hap = SimTTS(durations, speed), SimHaptics()
+    settings = dict(log_store.DEFAULT_SETTINGS)
+    vm = NavViewModel(RouteModel().steps, settings, speak=tts, vibrate=hap)
+    noop = lambda *a: None
+
+    t_start = time.perf_counter()
+    for offset, typ, label, value in timeline(rows):
+        if speed:
+            wait = t_start + offset / speed - time.perf_counter()
+            if wait > 0: time.sleep(wait)
+        if typ == "click_next":
+            vm.next_step(noop, noop)
+        elif typ == "click_reroute":
+            vm.reroute(noop, noop)
+        elif typ == "click_start_nav":
+            logger.log("click_start_nav")
+        elif typ == "tts_prewarm_ms":
+            logger.log("tts_prewarm_ms", "", prewarm("tts_prewarm_ms", speak=tts))
+        else:  # settings_*
+            settings[typ[9:]] = value; logger.log(typ, "", value)
+    tts.join()
+    # the logger only creates its file on the first event
+    new_rows = log_store.read_session_csv(out_path) if os.path.exists(out_path) else []
+    return session, metrics(rows), metrics(new_rows)
+
+def _stats(xs):
+    if not xs:
+        return 0, float("nan"), float("nan")
+    xs = sorted(xs)
+    return len(xs), statistics.median(xs), xs[min(len(xs)-1, int(round(0.9 * (len(xs)-1))))]
+
+def load_inputs(a):
+    sessions = {}
+    if a.store:
+        rows = log_store.select(log_store.read_index(a.store_dir), a.since, a.until)
+        cols = log_store.load_events(rows, a.store_dir)
+        for s, *rec in zip(cols["session"], cols["ts"], cols["type"], cols["label"], cols["value"]):
+            sessions.setdefault(str(s), []).append(tuple(str(x) for x in rec))
+    paths = [p for pat in (a.paths or ([] if a.store else [os.path.join("logs", "run_*.csv")]))
+             for p in sorted(glob.glob(pat))]
+    for p in paths:
+        sessions[os.path.basename(p)] = log_store.read_session_csv(p)
+    return sessions
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("paths", nargs="*", help="session CSVs or globs (default logs/run_*.csv)")
+    ap.add_argument("--store", action="store_true",
+                    help="replay compacted sessions (plus any paths given; without paths, loose CSVs are not read)")
+    ap.add_argument("--store-dir", default=log_store.STORE_DIR)
+    ap.add_argument("--since"); ap.add_argument("--until")
+    ap.add_argument("--speed", type=float, default=1.0, help="1 = real time, 0 = no waiting")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--out", default=OUT_DIR)
+    a = ap.parse_args()
+
+    loaded = load_inputs(a)
+    sessions = {s: rows for s, rows in loaded.items() if timeline(rows)}
+    skipped = len(loaded) - len(sessions)
+    if skipped:
+        print(f"[info] skipped {skipped} session(s) with no replayable input")
+    if not sessions:
+        raise SystemExit("No sessions to replay.")
+    os.makedirs(a.out, exist_ok=True)
+
+    t0 = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, min(a.jobs, len(sessions)))) as ex:
+        futs = [ex.submit(replay_one, s, rows, a.speed, a.out) for s, rows in sorted(sessions.items())]
+        for f in futs:
+            try:
+                results.append(f.result())
+            except Exception as e:
+                print(f"[warn] replay failed: {e}")
+    print(f"Replayed {len(results)} session(s) in {time.perf_counter()-t0:.1f} s (speed={a.speed:g})")
+
+    # simulated utterances are time-scaled, so tts_done_ms only compares at speed 1
+    used = [k for k in METRICS if a.speed == 1 or k != "tts_done_ms"]
+    diff_path = os.path.join(a.out, "replay_diff.csv")
+    pooled = {k: ([], []) for k in used}
+    with open(diff_path, "w", encoding="utf-8") as f:
+        f.write("session,metric,orig_n,orig_median,orig_p90,replay_n,replay_median,replay_p90,delta_median\n")
+        for session, orig, new in results:
+            for k in used:
+                if not orig[k] and not new[k]: continue
+                pooled[k][0].extend(orig[k]); pooled[k][1].extend(new[k])
+                o, r = _stats(orig[k]), _stats(new[k])
+                f.write(f"{session},{k},{o[0]},{o[1]:.1f},{o[2]:.1f},{r[0]},{r[1]:.1f},{r[2]:.1f},{r[1]-o[1]:.1f}\n")
+
+    print(f"\n{'metric':<22} {'orig n':>7} {'median':>7} {'p90':>7} | {'new n':>6} {'median':>7} {'p90':>7} | {'Δmedian':>8}")
+    for k, (o, r) in pooled.items():
+        if not o and not r: continue
+        so, sr = _stats(o), _stats(r)
+        print(f"{k:<22} {so[0]:>7} {so[1]:>7.1f} {so[2]:>7.1f} | {sr[0]:>6} {sr[1]:>7.1f} {sr[2]:>7.1f} | {sr[1]-so[1]:>+8.1f}")
+    print(f"\nPer-session diff -> {diff_path}")
+
+if __name__ == "__main__":
+    main()
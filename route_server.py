@@ -0,0 +1,153 @@
+"""
+route_server.py — asyncio HTTP/JSON route service
+Usage
+  python route_server.py [--port 8765] [--compute-ms 300] [--max-inflight 8] [--max-pending 64]
+Endpoints (HTTP/1.1, keep-alive)
+  POST /route    {"venue","origin","destination","persona"} -> {"steps": [...], ...}
+  POST /reroute  same body                                  -> {"steps": [...], "prompt": ...}
+  GET  /health   -> counters
+Behaviour
+  - venue = data/<venue>.json (default "route"); origin/destination are step
+    ids (default: whole route); persona is part of the request key (the demo
+    data has no persona-specific variants yet). Unknown venue/step ids get
+    404; an origin after the destination gets 400.
+  - Identical concurrent requests share one computation (request batching).
+  - At most --max-inflight computations run at once; once --max-pending
+    distinct computations are queued, new ones get 503 + Retry-After.
+  - --compute-ms stands in for route planning cost (same default as
+    NavViewModel.reroute).
+"""
+
+import json, time, asyncio, argparse
+from concurrent.futures import ThreadPoolExecutor
+from models.route_model import RouteModel, RouteOrderError
+
+REROUTE_PROMPT = "Recalculating route, please return to the corridor and proceed."
+
+class Overloaded(Exception):
+    pass
+
+class RouteService:
+    def __init__(self, data_dir="data", compute_ms=300, max_inflight=8, max_pending=64):
+        self.data_dir = data_dir
+        self.compute_ms = compute_ms
+        self.max_pending = max_pending
+        self._sem = asyncio.Semaphore(max_inflight)
+        self._pool = ThreadPoolExecutor(max_inflight)
+        self._inflight = {}   # request key -> Task (shared by identical requests)
+        self._models = {}     # venue -> RouteModel
+        self.stats = {"requests": 0, "computed": 0, "batched": 0, "rejected": 0, "errors": 0}
+
+    def _compute(self, kind, venue, origin, destination, persona):
+        """Runs in the worker thread pool."""
+        t0 = time.perf_counter()
+        m = self._models.get(venue)
+        if m is None:
+            m = self._models[venue] = RouteModel.for_venue(venue, self.data_dir)
+        steps = m.plan(origin, destination)
+        time.sleep(self.compute_ms / 1000.0)
+        out = {"venue": venue, "origin": origin, "destination": destination, "persona": persona,
+               "steps": steps, "compute_ms": int((time.perf_counter() - t0) * 1000)}
+        if kind == "reroute":
+            out["prompt"] = REROUTE_PROMPT
+        return out
+
+    async def _run(self, key):
+        async with self._sem:
+            self.stats["computed"] += 1
+            return await asyncio.get_running_loop().run_in_executor(self._pool, self._compute, *key)
+
+    async def get(self, key):
+        task = self._inflight.get(key)
+        if task is None:
+            if len(self._inflight) >= self.max_pending:
+                raise Overloaded()
+            task = asyncio.ensure_future(self._run(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        else:
+            self.stats["batched"] += 1
+        # shield: a client hanging up must not cancel work others wait on
+        return await asyncio.shield(task)
+
+    async def dispatch(self, method, path, body):
+        self.stats["requests"] += 1
+        if method == "GET" and path == "/health":
+            return 200, dict(self.stats, inflight=len(self._inflight))
+        if method != "POST" or path not in ("/route", "/reroute"):
+            return 404, {"error": "not found"}
+        try:
+            req = json.loads(body or b"{}")
+            key = (path[1:], str(req.get("venue", "route")),
+                   None if req.get("origin") is None else int(req["origin"]),
+                   None if req.get("destination") is None else int(req["destination"]),
+                   str(req.get("persona", "blind")))
+        except (ValueError, TypeError, AttributeError):
+            return 400, {"error": "bad request"}
+        try:
+            return 200, await self.get(key)
+        except Overloaded:
+            self.stats["rejected"] += 1
+            return 503, {"error": "overloaded"}
+        except KeyError as e:
+            return 404, {"error": f"unknown venue or step: {e.args[0]}"}
+        except RouteOrderError as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            self.stats["errors"] += 1
+            return 500, {"error": str(e)}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, path, _ = line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                body = await reader.readexactly(int(headers.get("content-length") or 0))
+                status, payload = await self.dispatch(method, path.split("?", 1)[0], body)
+                keep = headers.get("connection", "").lower() != "close"
+                data = json.dumps(payload).encode("utf-8")
+                extra = "Retry-After: 1\r\n" if status == 503 else ""
+                writer.write((f"HTTP/1.1 {status} {'OK' if status == 200 else 'ERR'}\r\n"
+                              f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                              f"Connection: {'keep-alive' if keep else 'close'}\r\n{extra}\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if not keep:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(host="127.0.0.1", port=8765, **kw):
+    svc = RouteService(**kw)
+    server = await asyncio.start_server(svc.handle, host, port, backlog=1024)
+    print(f"Route service on http://{host}:{port}  (compute {svc.compute_ms} ms)")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    ap = argparse.ArgumentParser(description="IndoorNav route service.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--data-dir", default="data")
+    ap.add_argument("--compute-ms", type=int, default=300)
+    ap.add_argument("--max-inflight", type=int, default=8)
+    ap.add_argument("--max-pending", type=int, default=64)
+    a = ap.parse_args()
+    try:
+        asyncio.run(serve(a.host, a.port, data_dir=a.data_dir, compute_ms=a.compute_ms,
+                          max_inflight=a.max_inflight, max_pending=a.max_pending))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,11 @@ Outputs
   charts/P6_sus.png    # SUS histogram
 Console
   Prints sample size and means. Gracefully warns if files/headers missing.
+  Charts are only re-rendered when their scores changed (--force to redo).
 """
 
-import os, numpy as np, pandas as pd, matplotlib.pyplot as plt
+import os, argparse, numpy as np, pandas as pd
+from services import charts
 
 os.makedirs("charts", exist_ok=True)
 
@@ -32,60 +34,57 @@ def read_csv_robust(path: str) -> pd.DataFrame:
             continue
     raise SystemExit(f"[error] Failed to read CSV: {path}")
 
-made_any = False
+def main():
+    ap = argparse.ArgumentParser(description="Score MARS/SUS surveys and draw P5/P6.")
+    ap.add_argument("--force", action="store_true", help="re-render charts even if unchanged")
+    args = ap.parse_args()
 
-# --------- MARS ----------
-if os.path.exists(MARS_PATH):
-    mars = read_csv_robust(MARS_PATH)
-    need = set(["E1","E2","E3","E4","E5","F1","F2","F3","F4","A1","A2","A3","I1","I2","I3","I4","S1"])
-    if need.issubset(set(mars.columns)):
-        def mean_cols(cols): 
-            return float(mars[cols].mean(axis=1).mean())
-        E = mean_cols(["E1","E2","E3","E4","E5"])
-        F = mean_cols(["F1","F2","F3","F4"])
-        A = mean_cols(["A1","A2","A3"])
-        I = mean_cols(["I1","I2","I3","I4"])
-        Overall = float(mars["S1"].mean())
+    made_any = False
+    jobs = []
 
-        plt.figure()
-        plt.bar(["Engagement","Functionality","Aesthetics","Information","Overall"],
-                [E, F, A, I, Overall])
-        plt.ylim(0, 5)
-        plt.ylabel("Mean (1–5)")
-        plt.title("P5 MARS subscales")
-        plt.savefig("charts/P5_mars.png", bbox_inches="tight")
-        plt.close()
-        print(f"[MARS] n={len(mars)}  E={E:.2f} F={F:.2f} A={A:.2f} I={I:.2f} Overall={Overall:.2f}")
-        made_any = True
+    # --------- MARS ----------
+    if os.path.exists(MARS_PATH):
+        mars = read_csv_robust(MARS_PATH)
+        need = set(["E1","E2","E3","E4","E5","F1","F2","F3","F4","A1","A2","A3","I1","I2","I3","I4","S1"])
+        if need.issubset(set(mars.columns)):
+            def mean_cols(cols): 
+                return float(mars[cols].mean(axis=1).mean())
+            E = mean_cols(["E1","E2","E3","E4","E5"])
+            F = mean_cols(["F1","F2","F3","F4"])
+            A = mean_cols(["A1","A2","A3"])
+            I = mean_cols(["I1","I2","I3","I4"])
+            Overall = float(mars["S1"].mean())
+            jobs.append(("P5_mars.png", charts.p5_mars, [E, F, A, I, Overall]))
+            print(f"[MARS] n={len(mars)}  E={E:.2f} F={F:.2f} A={A:.2f} I={I:.2f} Overall={Overall:.2f}")
+            made_any = True
+        else:
+            print("[warn] mars.csv missing headers. Got:", list(mars.columns))
     else:
-        print("[warn] mars.csv missing headers. Got:", list(mars.columns))
-else:
-    print("[info] surveys/mars.csv not found (skip MARS).")
+        print("[info] surveys/mars.csv not found (skip MARS).")
 
-# --------- SUS ----------
-if os.path.exists(SUS_PATH):
-    sus = read_csv_robust(SUS_PATH)
-    need = set([f"Q{i}" for i in range(1,11)])
-    if need.issubset(set(sus.columns)):
-        scores = []
-        for _, r in sus.iterrows():
-            odd  = sum(max(0, min(4, (r[q] or 0) - 1))   for q in ["Q1","Q3","Q5","Q7","Q9"])
-            even = sum(max(0, min(4, 5 - (r[q] or 0)))  for q in ["Q2","Q4","Q6","Q8","Q10"])
-            scores.append((odd + even) * 2.5)
-        mean_sus = float(np.mean(scores)) if scores else float("nan")
-
-        plt.figure()
-        plt.hist(scores, bins=5)
-        plt.xlabel("SUS score (0–100)")
-        plt.title("P6 SUS distribution")
-        plt.savefig("charts/P6_sus.png", bbox_inches="tight")
-        plt.close()
-        print(f"[SUS] n={len(scores)}  mean={mean_sus:.1f}")
-        made_any = True
+    # --------- SUS ----------
+    if os.path.exists(SUS_PATH):
+        sus = read_csv_robust(SUS_PATH)
+        need = set([f"Q{i}" for i in range(1,11)])
+        if need.issubset(set(sus.columns)):
+            scores = []
+            for _, r in sus.iterrows():
+                odd  = sum(max(0, min(4, (r[q] or 0) - 1))   for q in ["Q1","Q3","Q5","Q7","Q9"])
+                even = sum(max(0, min(4, 5 - (r[q] or 0)))  for q in ["Q2","Q4","Q6","Q8","Q10"])
+                scores.append((odd + even) * 2.5)
+            mean_sus = float(np.mean(scores)) if scores else float("nan")
+            jobs.append(("P6_sus.png", charts.p6_sus, [float(x) for x in scores]))
+            print(f"[SUS] n={len(scores)}  mean={mean_sus:.1f}")
+            made_any = True
+        else:
+            print("[warn] sus.csv missing headers. Got:", list(sus.columns))
     else:
-        print("[warn] sus.csv missing headers. Got:", list(sus.columns))
-else:
-    print("[info] surveys/sus.csv not found (skip SUS).")
+        print("[info] surveys/sus.csv not found (skip SUS).")
+
+    charts.render(jobs, "charts", force=args.force)
+
+    print("Charts saved -> ./charts" if made_any else
+          "No survey figures generated. Please check CSV paths/headers.")
 
-print("Charts saved -> ./charts" if made_any else
-      "No survey figures generated. Please check CSV paths/headers.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Chart rendering stage for analyze_logs.py and score_surveys.py.
+
+- Chart functions take (plt, data, path). `data` is plain Python
+  (numbers/lists/dicts) so it can be hashed and sent to worker processes.
+- render(jobs, out_dir="charts", force=False, workers=None):
+    jobs = [(png_name, chart_fn, data), ...]
+    * skips a chart when the hash of (chart code, data) matches the last
+      run (charts/.render_cache.json) and the PNG still exists
+    * renders the rest in a process pool with the Agg backend
+    * prints render time per chart, and pyplot import time once per
+      worker process (its warm-up; later charts in that worker reuse it)
+
+pyplot is only imported inside the workers, never by the scripts.
+"""
+
+import os, json, time, hashlib, inspect
+from concurrent.futures import ProcessPoolExecutor
+
+CACHE_NAME = ".render_cache.json"
+
+def _hash(fn, data):
+    h = hashlib.sha1()
+    h.update(inspect.getsource(fn).encode("utf-8"))
+    h.update(json.dumps(data, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+_import_ms = None  # pyplot import cost in this process, measured once
+
+def _render_one(fn, data, path):
+    """Runs in a worker: returns (pid, import_ms or None if already warm, render_ms)."""
+    global _import_ms
+    warm = _import_ms is not None
+    t0 = time.perf_counter()
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    t1 = time.perf_counter()
+    if not warm:
+        _import_ms = int((t1 - t0) * 1000)
+    plt.figure()
+    fn(plt, data, path)
+    plt.savefig(path, bbox_inches="tight")
+    plt.close("all")
+    t2 = time.perf_counter()
+    return os.getpid(), None if warm else _import_ms, int((t2 - t1) * 1000)
+
+def render(jobs, out_dir="charts", force=False, workers=None):
+    os.makedirs(out_dir, exist_ok=True)
+    cache_path = os.path.join(out_dir, CACHE_NAME)
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    todo = []
+    for name, fn, data in jobs:
+        path = os.path.join(out_dir, name)
+        key = _hash(fn, data)
+        if not force and cache.get(name) == key and os.path.exists(path):
+            print(f"[chart] {name:<18} skipped (unchanged)")
+            continue
+        todo.append((name, fn, data, path, key))
+
+    if todo:
+        t0 = time.perf_counter()
+        if len(todo) == 1:
+            results = [_render_one(*todo[0][1:4])]
+        else:
+            n = min(len(todo), workers or os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=n) as ex:
+                futs = [ex.submit(_render_one, fn, data, path) for _, fn, data, path, _ in todo]
+                results = [f.result() for f in futs]
+        for (name, _, _, _, key), (pid, imp_ms, ren_ms) in zip(todo, results):
+            cache[name] = key
+            warmup = "" if imp_ms is None else f"  (worker {pid} warm-up: pyplot import {imp_ms} ms)"
+            print(f"[chart] {name:<18} render {ren_ms:>5} ms{warmup}")
+        print(f"[chart] rendered {len(todo)} chart(s) in {int((time.perf_counter()-t0)*1000)} ms")
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+    return [t[0] for t in todo]
+
+# ---------- analyze_logs.py ----------
+def p1_startup(plt, d, path):
+    plt.bar(["cold","warm"], [d["cold"], d["warm"]])
+    plt.title("P1 Cold vs Warm (median ms)")
+    plt.ylabel("ms")
+
+def p2_tts(plt, d, path):
+    plt.bar(d["labels"], d["values"])
+    plt.xticks(rotation=90)
+    plt.xlabel("label")
+    plt.title("P2 TTS Start Latency by Step (median ms)")
+    plt.ylabel("ms")
+
+def p3_reroute(plt, values, path):
+    plt.hist(values, bins=10)
+    plt.title("P3 Reroute Latency Distribution")
+    plt.xlabel("ms")
+    plt.ylabel("Frequency")
+
+def p4_battery(plt, d, path):
+    plt.bar(["start(%)", "end(%)"], [d["start"], d["end"]])
+    plt.ylim(0, 100)
+    plt.title("P4 Battery % (session)")
+
+def p7_prewarm(plt, values, path):
+    plt.hist(values, bins=10)
+    plt.title("P7 TTS Prewarm (ms)")
+    plt.ylabel("Frequency")
+
+def p8_memory(plt, d, path):
+    for key, name in (("current", "traced (tracemalloc)"), ("rss", "peak RSS")):
+        if d[key]["t"]:
+            plt.plot(d[key]["t"], d[key]["kb"], marker="o", label=name)
+    for t, kb, point in zip(d["current"]["t"], d["current"]["kb"], d["current"]["point"]):
+        plt.annotate(point, (t, kb), fontsize=7, rotation=30)
+    plt.xlabel("s since session start")
+    plt.ylabel("KB")
+    plt.legend()
+    plt.title("P8 Memory over Session")
+
+# ---------- score_surveys.py ----------
+def p5_mars(plt, d, path):
+    plt.bar(["Engagement","Functionality","Aesthetics","Information","Overall"], d)
+    plt.ylim(0, 5)
+    plt.ylabel("Mean (1–5)")
+    plt.title("P5 MARS subscales")
+
+def p6_sus(plt, scores, path):
+    plt.hist(scores, bins=5)
+    plt.xlabel("SUS score (0–100)")
+    plt.title("P6 SUS distribution")
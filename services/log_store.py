@@ -0,0 +1,249 @@
+"""
+Partitioned session store for compacted logs.
+
+Layout (under logs/store/ by default):
+    index.csv                     one row per session (metadata below)
+    date=YYYY-MM-DD/events.npz    columnar events of every session that
+                                  started on that date
+
+Event columns: session, ts, type, label, value (raw text), value_ms
+(float; NaN when the value is not numeric, e.g. settings_* values).
+
+Index columns: session, partition, device, contrast, textscale,
+haptic_strength, persona (last value seen in the session), prewarm (0/1),
+n_events, n_click_next, n_click_reroute, n_tts_start, n_reroute,
+t_first, t_last.
+
+- compact(paths, store): merge run_*.csv sessions into the store;
+  sessions already indexed are skipped unless their CSV changed since
+  (the app was still writing it): a grown CSV replaces the stored rows,
+  and one recreated after --delete is appended to them. Partitions are
+  written before the index; rows of a session left unindexed by an
+  interrupted run are replaced, not duplicated, on the next run.
+  Returns the new/updated index rows.
+- is_compacted(rows, meta): True when the index row says all of a CSV's
+  rows were stored (no more rows, same last timestamp).
+- read_index(store) / select(rows, since, until, **where): metadata-only
+  pruning, no event rows are read.
+- load_events(rows, store): read only the partitions the selected rows
+  live in, and only those sessions' events.
+- latest_session(log_dir, store): newest session from loose CSVs or the store.
+- loose_sessions(log_dir, store): CSVs not in the store, or changed since;
+  read_loose(path, store) returns such a CSV's full session rows.
+
+Only numpy (already a dependency of the analysis scripts) is needed.
+"""
+
+import os, csv, glob
+import numpy as np
+
+STORE_DIR = os.path.join("logs", "store")
+COLUMNS = ("session", "ts", "type", "label", "value")
+
+# mirrors main.DEFAULT_SETTINGS (main.py imports Kivy, so not imported here)
+DEFAULT_SETTINGS = {
+    "contrast": "normal",
+    "textscale": "normal",
+    "haptic_strength": "normal",
+    "persona": "blind"
+}
+
+COUNTED = {
+    "n_click_next": "click_next",
+    "n_click_reroute": "click_reroute",
+    "n_tts_start": "tts_start_latency_ms",
+    "n_reroute": "reroute_latency_ms",
+}
+
+INDEX_FIELDS = (["session", "partition", "device"] + list(DEFAULT_SETTINGS)
+                + ["prewarm", "n_events"] + list(COUNTED) + ["t_first", "t_last"])
+
+def index_path(store=STORE_DIR):
+    return os.path.join(store, "index.csv")
+
+def partition_path(partition, store=STORE_DIR):
+    return os.path.join(store, f"date={partition}", "events.npz")
+
+def read_session_csv(path):
+    """Rows of one run_*.csv as (ts, type, label, value) string tuples."""
+    with open(path, newline="", encoding="utf-8") as f:
+        r = csv.reader(f)
+        next(r, None)  # header
+        return [tuple((row + ["", "", "", ""])[:4]) for row in r if row]
+
+def _partition_of(session, rows):
+    if rows and len(rows[0][0]) >= 10:
+        return rows[0][0][:10]
+    # run_YYYYmmdd_HHMMSS.csv
+    d = session[4:12]
+    return f"{d[:4]}-{d[4:6]}-{d[6:8]}" if d.isdigit() else "unknown"
+
+def session_meta(session, rows):
+    """Index row for one session (rows as returned by read_session_csv)."""
+    meta = {"session": session, "partition": _partition_of(session, rows),
+            "device": "unknown", **DEFAULT_SETTINGS, "prewarm": 0,
+            "n_events": len(rows), **{k: 0 for k in COUNTED},
+            "t_first": rows[0][0] if rows else "", "t_last": rows[-1][0] if rows else ""}
+    by_type = {v: k for k, v in COUNTED.items()}
+    for ts, typ, label, value in rows:
+        if typ == "device":
+            meta["device"] = label or "unknown"
+        elif typ == "tts_prewarm_ms":
+            meta["prewarm"] = 1
+        elif typ.startswith("settings_") and typ[9:] in DEFAULT_SETTINGS:
+            meta[typ[9:]] = value
+        if typ in by_type:
+            meta[by_type[typ]] += 1
+    return meta
+
+def read_index(store=STORE_DIR):
+    p = index_path(store)
+    if not os.path.exists(p):
+        return []
+    with open(p, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    for r in rows:
+        for k in ["prewarm", "n_events"] + list(COUNTED):
+            r[k] = int(r[k] or 0)
+    return rows
+
+def _write_index(rows, store):
+    p = index_path(store); tmp = p + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=INDEX_FIELDS)
+        w.writeheader(); w.writerows(rows)
+    os.replace(tmp, p)
+
+def _to_float(v):
+    try:
+        return float(v)
+    except ValueError:
+        return float("nan")
+
+def _read_partition(path):
+    with np.load(path, allow_pickle=False) as z:
+        return {k: z[k] for k in z.files}
+
+def _write_partition(path, cols):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(tmp, **cols)
+    os.replace(tmp, path)
+
+def is_compacted(rows, meta):
+    """True if every row of a session's CSV is in the store per its index
+    row `meta` (a CSV recreated after --delete holds fewer rows)."""
+    return len(rows) <= meta["n_events"] and (rows[-1][0] if rows else "") == meta["t_last"]
+
+def _stored_rows(meta, store):
+    cols = load_events([meta], store)
+    return list(zip(*(cols[c].tolist() for c in COLUMNS[1:])))
+
+def _with_stored_head(rows, meta, store):
+    """Rows of a changed, already indexed CSV; one recreated after --delete
+    (new header and device row) only holds the tail, so prepend the stored rows."""
+    if rows and rows[0][0] == meta["t_first"]:
+        return rows
+    tail = rows[1:] if rows and rows[0][1] == "device" else rows
+    head = _stored_rows(meta, store)
+    if tail:  # the store may already hold an earlier version of this tail
+        head = [r for r in head if r[0] < tail[0][0]]
+    return head + tail
+
+def read_loose(path, store=STORE_DIR):
+    """Full rows of a loose_sessions() CSV, including any stored head."""
+    rows = read_session_csv(path)
+    meta = {r["session"]: r for r in read_index(store)}.get(os.path.basename(path))
+    return rows if meta is None else _with_stored_head(rows, meta, store)
+
+def compact(paths, store=STORE_DIR):
+    """Merge CSV sessions into date partitions; returns the new/updated index rows."""
+    os.makedirs(store, exist_ok=True)
+    index = read_index(store)
+    known = {r["session"]: r for r in index}
+    new_by_part = {}
+    added = []
+    for path in sorted(paths):
+        session = os.path.basename(path)
+        try:
+            rows = read_session_csv(path)
+        except Exception as e:
+            print(f"[warn] skip {path}: {e}")
+            continue
+        if session in known:
+            if is_compacted(rows, known[session]):
+                continue
+            rows = _with_stored_head(rows, known[session], store)
+        meta = session_meta(session, rows)
+        new_by_part.setdefault(meta["partition"], []).append((session, rows))
+        added.append(meta); known[session] = meta
+
+    for part, sessions in new_by_part.items():
+        cols = {c: [] for c in COLUMNS}
+        for session, rows in sessions:
+            for ts, typ, label, value in rows:
+                cols["session"].append(session); cols["ts"].append(ts)
+                cols["type"].append(typ); cols["label"].append(label)
+                cols["value"].append(value)
+        new = {c: np.array(v, dtype=str) for c, v in cols.items()}
+        new["value_ms"] = np.array([_to_float(v) for v in cols["value"]], dtype=float)
+        path = partition_path(part, store)
+        if os.path.exists(path):
+            old = _read_partition(path)
+            # drop rows of sessions being (re)written: a run interrupted after the
+            # partition write but before the index write must not double them
+            keep = ~np.isin(old["session"], [sess for sess, _ in sessions])
+            new = {c: np.concatenate([old[c][keep], new[c]]) for c in new}
+        _write_partition(path, new)
+
+    if added:
+        updated = {m["session"] for m in added}
+        _write_index([r for r in index if r["session"] not in updated] + added, store)
+    return added
+
+def select(rows, since=None, until=None, **where):
+    """Filter index rows by partition date (inclusive, 'YYYY-MM-DD') and
+    exact metadata matches; None values in `where` are ignored."""
+    out = []
+    for r in rows:
+        if since and r["partition"] < since: continue
+        if until and r["partition"] > until: continue
+        if any(v is not None and str(r.get(k)) != str(v) for k, v in where.items()): continue
+        out.append(r)
+    return out
+
+def load_events(rows, store=STORE_DIR):
+    """Columns (dict of numpy arrays) for the sessions in `rows`."""
+    want = {}
+    for r in rows:
+        want.setdefault(r["partition"], set()).add(r["session"])
+    parts = []
+    for part in sorted(want):
+        cols = _read_partition(partition_path(part, store))
+        mask = np.isin(cols["session"], list(want[part]))
+        parts.append({c: v[mask] for c, v in cols.items()})
+    if not parts:
+        return {c: np.array([], dtype=str) for c in COLUMNS} | {"value_ms": np.array([], dtype=float)}
+    return {c: np.concatenate([p[c] for p in parts]) for c in parts[0]}
+
+def latest_session(log_dir="logs", store=STORE_DIR):
+    """(session, rows) of the most recent session, loose CSV or compacted."""
+    loose = {os.path.basename(f): f for f in loose_sessions(log_dir, store)}
+    index = {r["session"]: r for r in read_index(store)}
+    if not loose and not index:
+        return None, []
+    name = max(set(loose) | set(index))  # run_YYYYmmdd_HHMMSS sorts by time
+    if name in loose:
+        return name, read_loose(loose[name], store)
+    return name, _stored_rows(index[name], store)
+
+def loose_sessions(log_dir="logs", store=STORE_DIR):
+    """run_*.csv files in log_dir that are not in the store yet, or that
+    changed after they were compacted (the app was still writing them)."""
+    known = {r["session"]: r for r in read_index(store)}
+    out = []
+    for f in sorted(glob.glob(os.path.join(log_dir, "run_*.csv"))):
+        meta = known.get(os.path.basename(f))
+        if meta is None or not is_compacted(read_session_csv(f), meta):
+            out.append(f)
+    return out
@@ -1,23 +1,46 @@
 """
 CSV event logger.
 
-- Creates logs/run_YYYYmmdd_HHMMSS.csv on import.
+- Creates logs/run_YYYYmmdd_HHMMSS.csv on the first log() call, so
+  importing this module from scripts/tests no longer leaves empty files.
+- The first row after the header is a `device` event (label = platform),
+  used by compact_logs.py to index sessions.
 - log(type, label="", value_ms="") appends a row:
     ts | type | label | value_ms
+- If the file disappears mid-session (compact_logs.py --delete), the next
+  log() recreates it with the header and device row.
+- set_log_path(path): send the rest of this process's events elsewhere.
 - APP_T0 captures process start for cold-start measurements.
 """
 
-import os, csv, time
+import os, csv, time, platform, threading
 from datetime import datetime
 
-os.makedirs("logs", exist_ok=True)
 LOG_PATH = os.path.join("logs", f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+DEVICE = f"{platform.system()} {platform.release()} {platform.machine()}".strip()
 
-with open(LOG_PATH, "w", newline="", encoding="utf-8") as f:
-    csv.writer(f).writerow(["ts", "type", "label", "value_ms"])
+_lock = threading.Lock()
+_opened = False
+
+def _open():
+    global _opened
+    os.makedirs(os.path.dirname(LOG_PATH) or ".", exist_ok=True)
+    with open(LOG_PATH, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["ts", "type", "label", "value_ms"])
+        w.writerow([datetime.now().isoformat(), "device", DEVICE, ""])
+    _opened = True
+
+def set_log_path(path):
+    global LOG_PATH, _opened
+    with _lock:
+        LOG_PATH = path; _opened = False
 
 def log(evt_type, label="", value_ms=""):
-    with open(LOG_PATH, "a", newline="", encoding="utf-8") as f:
-        csv.writer(f).writerow([datetime.now().isoformat(), evt_type, label, value_ms])
+    with _lock:
+        if not _opened or not os.path.exists(LOG_PATH):
+            _open()
+        with open(LOG_PATH, "a", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow([datetime.now().isoformat(), evt_type, label, value_ms])
 
 APP_T0 = time.perf_counter()
@@ -0,0 +1,106 @@
+"""
+Opt-in memory snapshots (INDOORNAV_MEMPROF=1).
+
+- start(): begins tracemalloc tracing (no-op when disabled).
+- snapshot(point, top=TOP_N): logs
+    mem_current_kb | point           | traced bytes now (KB)
+    mem_peak_kb    | point           | traced peak so far (KB)
+    mem_rss_kb     | point           | process peak RSS (KB; if available)
+    mem_top_kb     | point|file:line | top allocation sites (KB)
+- track(label): context manager logging mem_alloc_kb for the allocations
+  made inside the block (e.g. building the route steps).
+- snapshot_later(point): snapshot() once the current UI event is done,
+  via the `defer` hook main.py sets to Clock.schedule_once (immediately
+  when headless), so the snapshot does not land inside a measured latency.
+- EVERY_N_STEPS: NavViewModel snapshots after every N "Next" taps
+  (INDOORNAV_MEMPROF_STEPS, default 5; values < 1 are clamped to 1).
+
+Peak RSS comes from resource (Linux/macOS) or psutil (Windows, where
+it reports the peak working set); it is skipped when neither exists.
+Everything is a no-op when disabled.
+"""
+
+import os, tracemalloc
+from services.logger import log
+
+def _every_n_steps(default=5):
+    try:
+        return max(1, int(os.environ.get("INDOORNAV_MEMPROF_STEPS", default)))
+    except ValueError:
+        return default
+
+ENABLED = os.environ.get("INDOORNAV_MEMPROF", "") not in ("", "0")
+TOP_N = 5
+EVERY_N_STEPS = _every_n_steps()
+FRAMES = 1
+defer = None  # callable(fn) that runs fn after the current UI event; set by main.py
+
+try:
+    import resource
+    HAVE_RESOURCE = True
+except Exception:
+    HAVE_RESOURCE = False
+
+try:
+    import psutil
+    HAVE_PSUTIL = True
+except Exception:
+    HAVE_PSUTIL = False
+
+_FILTERS = [tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>")]
+
+def start():
+    if ENABLED and not tracemalloc.is_tracing():
+        tracemalloc.start(FRAMES)
+
+def peak_rss_kb():
+    if HAVE_RESOURCE:
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return kb // 1024 if os.uname().sysname == "Darwin" else kb  # macOS reports bytes
+    if HAVE_PSUTIL:
+        mi = psutil.Process().memory_info()
+        return int(getattr(mi, "peak_wset", mi.rss)) // 1024
+    return None
+
+def snapshot(point, top=TOP_N):
+    if not ENABLED or not tracemalloc.is_tracing():
+        return
+    cur, peak = tracemalloc.get_traced_memory()
+    log("mem_current_kb", point, cur // 1024)
+    log("mem_peak_kb", point, peak // 1024)
+    rss = peak_rss_kb()
+    if rss is not None:
+        log("mem_rss_kb", point, rss)
+    stats = tracemalloc.take_snapshot().filter_traces(_FILTERS).statistics("lineno")
+    for st in stats[:top]:
+        fr = st.traceback[0]
+        log("mem_top_kb", f"{point}|{os.path.basename(fr.filename)}:{fr.lineno}", round(st.size / 1024, 1))
+
+def snapshot_later(point, top=TOP_N):
+    if not ENABLED:
+        return
+    if defer is None:
+        snapshot(point, top)
+    else:
+        defer(lambda: snapshot(point, top))
+
+class track:
+    """with memprof.track("route_steps"): ...  -> logs mem_alloc_kb."""
+    def __init__(self, label):
+        self.label = label
+
+    def __enter__(self):
+        self.on = ENABLED and tracemalloc.is_tracing()
+        if self.on:
+            self.before = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+        return self
+
+    def __exit__(self, *exc):
+        if self.on:
+            after = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+            diff = sum(st.size_diff for st in after.compare_to(self.before, "filename"))
+            log("mem_alloc_kb", self.label, round(diff / 1024, 1))
+        return False
@@ -0,0 +1,85 @@
+"""
+Client for route_server.py.
+
+- RouteClient(base_url, venue="route", timeout=1.0)
+  Calls are made from the UI thread, so the timeout is short and a request
+  is retried only when a reused pooled socket turns out to be stale
+  (never after a timeout or on a fresh connection).
+- route(origin=None, destination=None, persona="blind") -> steps list
+- reroute(origin, destination, persona) -> (steps, prompt)
+- Connections are HTTP/1.1 keep-alive and pooled (LIFO), so the UI thread
+  and background threads reuse open sockets instead of reconnecting.
+- Errors (including an empty route) surface as RouteServiceError; callers
+  fall back to local data.
+"""
+
+import json, queue, socket
+import http.client
+from urllib.parse import urlsplit
+
+class RouteServiceError(Exception):
+    pass
+
+class RouteClient:
+    def __init__(self, base_url="http://127.0.0.1:8765", venue="route", timeout=1.0, pool_size=4):
+        u = urlsplit(base_url)
+        self.host, self.port = u.hostname or "127.0.0.1", u.port or 80
+        self.venue = venue
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    def _acquire(self):
+        """(connection, reused) — reused is True for a pooled keep-alive socket."""
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _post(self, path, payload):
+        body = json.dumps(payload)
+        while True:
+            conn, reused = self._acquire()
+            try:
+                conn.request("POST", path, body, {"Content-Type": "application/json"})
+                resp = conn.getresponse()
+                data = json.loads(resp.read() or b"{}")
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                conn.close()
+                # a pooled socket the server already closed fails fast: retry on
+                # another one; timeouts and fresh connections fail immediately
+                stale = reused and not isinstance(e, (socket.timeout, ValueError))
+                if not stale:
+                    raise RouteServiceError(str(e)) from e
+                continue
+            self._release(conn)
+            if resp.status != 200:
+                raise RouteServiceError(f"{resp.status}: {data.get('error', '')}")
+            return data
+
+    def _payload(self, origin, destination, persona):
+        return {"venue": self.venue, "origin": origin, "destination": destination, "persona": persona}
+
+    def _steps(self, d):
+        if not d.get("steps"):
+            raise RouteServiceError("empty route")
+        return d["steps"]
+
+    def route(self, origin=None, destination=None, persona="blind"):
+        return self._steps(self._post("/route", self._payload(origin, destination, persona)))
+
+    def reroute(self, origin=None, destination=None, persona="blind"):
+        d = self._post("/reroute", self._payload(origin, destination, persona))
+        return self._steps(d), d.get("prompt", "")
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
@@ -0,0 +1,129 @@
+"""
+Span tracing with Chrome trace-event export.
+
+- start(name, parent=None, t0=None, **args) -> Span
+    opens a span; parent defaults to the innermost open span on the
+    calling thread. Pass parent= explicitly to link work handed to
+    another thread (tap -> TTS thread -> haptic thread).
+- Span.end() -> int ms; Span.elapsed_ms() -> int ms (span stays open).
+  Spans also work as context managers: `with tracing.start("x"): ...`
+- export_chrome(path): writes {"traceEvents": [...]} for chrome://tracing
+  or https://ui.perfetto.dev. Cross-thread parent links become flow arrows.
+
+Tracing is off unless INDOORNAV_TRACE=1 (or enable() is called).
+When off, a span is only a perf_counter() pair: no IDs, no thread-local
+stack, nothing recorded. Timings (end/elapsed_ms) work either way, so
+callers can use spans for their latency logs unconditionally.
+"""
+
+import os, json, time, threading, itertools
+
+ENABLED = os.environ.get("INDOORNAV_TRACE", "") not in ("", "0")
+
+_ids = itertools.count(1)
+_local = threading.local()
+_records = []           # finished spans; list.append is atomic under the GIL
+_PID = os.getpid()
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = bool(on)
+
+def _stack():
+    s = getattr(_local, "stack", None)
+    if s is None:
+        s = _local.stack = []
+    return s
+
+def current():
+    """Innermost open span on this thread (None if tracing is off)."""
+    if not ENABLED:
+        return None
+    s = _stack()
+    return s[-1] if s else None
+
+class Span:
+    __slots__ = ("name", "id", "parent", "tid", "t0", "t1", "args", "_pushed", "_owner")
+
+    def __init__(self, name, parent=None, t0=None, args=None):
+        self.name = name
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.t1 = None
+        self.args = args
+        self._pushed = False
+        self._owner = None
+        if ENABLED:
+            self.id = next(_ids)
+            self.parent = parent if parent is not None else current()
+            self.tid = threading.get_ident()
+            self._owner = _stack()  # the opening thread's stack
+            self._owner.append(self); self._pushed = True
+        else:
+            self.id = 0; self.parent = None; self.tid = 0
+
+    def elapsed_ms(self):
+        return int((time.perf_counter() - self.t0) * 1000)
+
+    def end(self):
+        """Close the span (idempotent) and return its duration in ms."""
+        if self.t1 is None:
+            self.t1 = time.perf_counter()
+            if self._pushed:
+                # may be ended from another thread: pop it from the stack it was opened on
+                if self in self._owner:
+                    self._owner.remove(self)
+                _records.append(self)
+        return int((self.t1 - self.t0) * 1000)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.end()
+        return False
+
+def start(name, parent=None, t0=None, **args):
+    return Span(name, parent, t0, args or None)
+
+def instant(name, parent=None, **args):
+    """Zero-length span (a marker on the timeline)."""
+    s = Span(name, parent, None, args or None)
+    s.t1 = s.t0
+    if s._pushed:
+        s._owner.remove(s); _records.append(s)
+    return s
+
+def spans():
+    return list(_records)
+
+def clear():
+    del _records[:]
+
+def chrome_events():
+    recs = list(_records)
+    # origin = earliest span start, so spans opened with an earlier t0
+    # (e.g. cold_start from logger.APP_T0) still land at ts >= 0
+    t_origin = min((s.t0 for s in recs), default=0.0)
+    _us = lambda t: round((t - t_origin) * 1e6, 1)
+    events = []
+    for s in recs:
+        args = dict(s.args or {})
+        args["span_id"] = s.id
+        if s.parent is not None:
+            args["parent_id"] = s.parent.id
+        events.append({"name": s.name, "ph": "X", "pid": _PID, "tid": s.tid,
+                       "ts": _us(s.t0), "dur": round((s.t1 - s.t0) * 1e6, 1), "args": args})
+        p = s.parent
+        if p is not None and p.tid != s.tid:
+            # flow arrow parent -> child across threads
+            events.append({"name": "link", "cat": "flow", "ph": "s", "id": s.id,
+                           "pid": _PID, "tid": p.tid, "ts": _us(max(p.t0, min(s.t0, p.t1 or s.t0)))})
+            events.append({"name": "link", "cat": "flow", "ph": "f", "bp": "e", "id": s.id,
+                           "pid": _PID, "tid": s.tid, "ts": _us(s.t0)})
+    events.sort(key=lambda e: e["ts"])
+    return events
+
+def export_chrome(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": chrome_events(), "displayTimeUnit": "ms"}, f)
+    return path
@@ -6,9 +6,13 @@ Order of attempts:
 2) pyttsx3 (cross-platform speech engine)
 3) fallback sleep() to simulate speech duration
 
-- speak_async(text, on_start, on_done, label):
+- speak_async(text, on_start, on_done, label, parent=None):
     runs in a background thread; never raises to caller.
-- prewarm(label): triggers a minimal utterance to warm caches.
+    The utterance is traced as a "tts" span under `parent`.
+- prewarm(label, speak=None): triggers a minimal utterance to warm caches
+    (speak defaults to speak_async).
+- The pyttsx3 engine is created on first use, not at import, so headless
+  tools (replay_sessions.py) never start a real speech backend.
 """
 # If your editor flags plyer imports, it's safe to silence:
 # from plyer import tts as plyer_tts  # type: ignore
@@ -20,15 +24,20 @@ Order of attempts:
 2) pyttsx3 (cross-platform speech engine)
 3) fallback sleep() to simulate speech duration
 
-- speak_async(text, on_start, on_done, label):
+- speak_async(text, on_start, on_done, label, parent=None):
     runs in a background thread; never raises to caller.
-- prewarm(label): triggers a minimal utterance to warm caches.
+    The utterance is traced as a "tts" span under `parent`.
+- prewarm(label, speak=None): triggers a minimal utterance to warm caches
+    (speak defaults to speak_async).
+- The pyttsx3 engine is created on first use, not at import, so headless
+  tools (replay_sessions.py) never start a real speech backend.
 """
 # If your editor flags plyer imports, it's safe to silence:
 # from plyer import tts as plyer_tts  # type: ignore
 
 import threading, time
 from services.logger import log
+from services import tracing
 
 try:
     from plyer import tts as plyer_tts
@@ -38,26 +47,40 @@ except Exception:
 
 try:
     import pyttsx3
-    engine = pyttsx3.init()
     HAVE_PYTT = True
 except Exception:
     HAVE_PYTT = False
-    engine = None
+
+engine = None
+_engine_lock = threading.Lock()
+
+def _engine():
+    """pyttsx3 engine, initialised on first use (None if unavailable)."""
+    global engine, HAVE_PYTT
+    with _engine_lock:
+        if engine is None and HAVE_PYTT:
+            try:
+                engine = pyttsx3.init()
+            except Exception:
+                HAVE_PYTT = False
+        return engine
 
 def _speak_with_plyer(text: str) -> bool:
     plyer_tts.speak(text)  
     return True
 
 def _speak_with_pyttsx3(text: str) -> bool:
-    if not (HAVE_PYTT and engine):
+    eng = _engine()
+    if eng is None:
         return False
-    engine.say(text)
-    engine.runAndWait()
+    eng.say(text)
+    eng.runAndWait()
     return True
 
-def speak_async(text: str, on_start=None, on_done=None, label="tts"):
+def speak_async(text: str, on_start=None, on_done=None, label="tts", parent=None):
     def _run():
-        t0 = time.perf_counter()
+        sp = tracing.start("tts", parent=parent, label=label)
+        t0 = sp.t0
         if on_start:
             on_start(label, t0)
         try:
@@ -70,19 +93,19 @@ def speak_async(text: str, on_start=None, on_done=None, label="tts"):
                     played = False  
             if not played and HAVE_PYTT:
                 try:
-                    _speak_with_pyttsx3(text)
-                    played = True
+                    played = _speak_with_pyttsx3(text)
                 except Exception:
                     played = False
             if not played:
                 time.sleep(0.4)
         finally:
+            sp.end()
             if on_done:
-                on_done(label, t0, time.perf_counter())
+                on_done(label, t0, sp.t1)
     threading.Thread(target=_run, daemon=True).start()
 
-def prewarm(label="tts_prewarm_ms"):
-    t0 = time.perf_counter()
-    speak_async("Ready", None, None, label)
+def prewarm(label="tts_prewarm_ms", speak=None):
+    sp = tracing.start("tts_prewarm")
+    (speak or speak_async)("Ready", None, None, label, parent=sp)
     time.sleep(0.05)
-    return int((time.perf_counter() - t0) * 1000)
+    return sp.end()
@@ -6,57 +6,86 @@ Public API:
     * Logs click_next, TTS start latency, and plays haptics
 - reroute(on_text, on_progress, compute_ms=300)
     * Simulates a reroute computation; logs reroute_latency_ms
+    * Client mode (client=RouteClient): asks route_server.py for a new
+      route from the current step instead; on failure logs
+      route_server_error and keeps the current steps.
 
 Notes:
+- speak/vibrate default to services.tts_adapter.speak_async and
+  services.haptics.vibrate_pattern; replay_sessions.py passes simulated ones.
 - self.settings expects dict keys: contrast, textscale, haptic_strength, persona
 - All latency values are recorded in milliseconds for evaluation scripts.
+- With INDOORNAV_MEMPROF=1, memory snapshots are logged every
+  memprof.EVERY_N_STEPS "Next" taps and after each reroute (deferred past
+  the tap via memprof.snapshot_later).
+- Each tap opens a tracing span; the TTS and haptic threads hang their
+  spans under it (tap -> tts -> done on one timeline).
 """
 # _on_start callback logs latency: tap Next -> TTS callback started
 # Use max(1, ...) to avoid 0 ms floor in integer rounding.
 
 import time
 from services.logger import log
+from services import tracing, memprof
 from services.tts_adapter import speak_async
 from services.haptics import vibrate_pattern
+from services.route_client import RouteServiceError
 
 class NavViewModel:
-    def __init__(self, steps, settings):
+    def __init__(self, steps, settings, client=None, speak=speak_async, vibrate=vibrate_pattern):
         self.steps = steps
         self.idx = 0
-        self._click_t0 = None
         self.settings = settings  # {"contrast","textscale","haptic_strength","persona"}
+        self.client = client      # RouteClient or None (local simulation)
+        self.speak, self.vibrate = speak, vibrate
+        self.n_next = 0           # "Next" taps, for periodic memory snapshots
 
     def next_step(self, on_text, on_progress):
         if self.idx >= len(self.steps):
             return "arrived"
-        self._click_t0 = time.perf_counter()
-
         step = self.steps[self.idx]
+        tap = tracing.start("tap_next", step=step["id"])
+
         on_text(step["text"])
         on_progress(self.idx+1, len(self.steps))
         log("click_next", f"step_{step['id']}")
 
+        # measured from this tap, not the latest one (taps may overlap TTS)
         def _on_start(label, t0):
-            if self._click_t0:
-                latency_ms = max(1, int((time.perf_counter() - self._click_t0) * 1000))
-                log("tts_start_latency_ms", label, latency_ms)
+            latency_ms = max(1, int((t0 - tap.t0) * 1000))
+            log("tts_start_latency_ms", label, latency_ms)
 
         def _on_done(label, t0, t1):
             dur = int((t1 - t0)*1000); log("tts_done_ms", label, dur)
 
-        speak_async(step["text"], _on_start, _on_done, f"step_{step['id']}")
-        vibrate_pattern(step.get("type","forward"), self.settings.get("haptic_strength","normal"))
+        self.speak(step["text"], _on_start, _on_done, f"step_{step['id']}", parent=tap)
+        self.vibrate(step.get("type","forward"), self.settings.get("haptic_strength","normal"), parent=tap)
         self.idx += 1
+        self.n_next += 1
+        tap.end()
+        if memprof.ENABLED and self.n_next % memprof.EVERY_N_STEPS == 0:
+            memprof.snapshot_later(f"steps_{self.n_next}")
         return "arrived" if self.idx >= len(self.steps) else "continue"
 
     def reroute(self, on_text, on_progress, compute_ms=300):
-        self._click_t0 = time.perf_counter()
+        tap = tracing.start("tap_reroute")
         log("click_reroute")
-        time.sleep(compute_ms/1000.0)
-        latency = int((time.perf_counter()-self._click_t0)*1000)
-        log("reroute_latency_ms", "reroute", latency)
+        txt = "Recalculating route, please return to the corridor and proceed."
+        with tracing.start("reroute_compute"):
+            if self.client is None:
+                time.sleep(compute_ms/1000.0)
+            else:
+                here = self.steps[max(self.idx-1, 0)]["id"]
+                try:
+                    steps, prompt = self.client.reroute(here, self.steps[-1]["id"],
+                                                        self.settings.get("persona","blind"))
+                    self.steps, txt = steps, prompt or txt
+                except RouteServiceError as e:
+                    log("route_server_error", "reroute", str(e))
+        log("reroute_latency_ms", "reroute", tap.elapsed_ms())
         self.idx = 0
         on_progress(self.idx, len(self.steps))
-        txt = "Recalculating route, please return to the corridor and proceed."
-        on_text(txt); speak_async(txt, None, None, "reroute")
-        vibrate_pattern("forward", self.settings.get("haptic_strength","normal"))
+        on_text(txt); self.speak(txt, None, None, "reroute", parent=tap)
+        self.vibrate("forward", self.settings.get("haptic_strength","normal"), parent=tap)
+        tap.end()
+        memprof.snapshot_later("reroute")